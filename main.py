@@ -1,18 +1,20 @@
 import sys
+import bisect
+import math
 import random
-import time
-from typing import List, Optional, Dict
+from collections import deque
+from typing import List, Optional, Dict, Deque, Tuple, Set
 from enum import Enum
 from dataclasses import dataclass
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QGraphicsScene, QGraphicsView,
     QPushButton, QVBoxLayout, QHBoxLayout, QWidget, QGraphicsEllipseItem,
-    QGraphicsTextItem, QLineEdit, QLabel, QTextEdit, QFormLayout, QGroupBox,
+    QLineEdit, QLabel, QPlainTextEdit, QFormLayout, QGroupBox,
     QComboBox, QCheckBox, QGraphicsLineItem, QGraphicsSimpleTextItem,
     QDialog, QListWidget, QTabWidget, QSpinBox, QProgressBar
 )
-from PyQt6.QtGui import QColor, QBrush, QPen, QFont, QPainter
-from PyQt6.QtCore import Qt, QTimer, QPointF, QRectF
+from PyQt6.QtGui import QColor, QBrush, QPen, QFont, QPainter, QDoubleValidator
+from PyQt6.QtCore import Qt, QTimer, QPointF, QRectF, QElapsedTimer, QLocale
 
 
 # ==================== Packet Module ====================
@@ -23,8 +25,21 @@ class PacketType(Enum):
     DATA = "DATA"
     ACK = "ACK"
 
+    def __init__(self, _value):
+        # Целочисленный код типа пакета (порядок объявления) для индексации таблиц
+        self.code = len(type(self).__members__)
 
-@dataclass
+
+# Шаблоны текстового представления пакета, индексируемые кодом типа
+_PACKET_FMT = (
+    "RTS: {s}→{r} (dur={d})",
+    "CTS: {r}→{s} (dur={d})",
+    "DATA: {s}→{r} [{data}]",
+    "ACK: {r}→{s}",
+)
+
+
+@dataclass(slots=True)
 class Packet:
     packet_type: PacketType
     sender_id: int
@@ -34,15 +49,9 @@ class Packet:
     message_id: int = 0
 
     def __str__(self):
-        if self.packet_type == PacketType.RTS:
-            return f"RTS: {self.sender_id}→{self.receiver_id} (dur={self.duration})"
-        elif self.packet_type == PacketType.CTS:
-            return f"CTS: {self.receiver_id}→{self.sender_id} (dur={self.duration})"
-        elif self.packet_type == PacketType.DATA:
-            return f"DATA: {self.sender_id}→{self.receiver_id} [{self.data}]"
-        elif self.packet_type == PacketType.ACK:
-            return f"ACK: {self.receiver_id}→{self.sender_id}"
-        return ""
+        return _PACKET_FMT[self.packet_type.code].format(
+            s=self.sender_id, r=self.receiver_id, d=self.duration, data=self.data
+        )
 
 
 # ==================== Station Module ====================
@@ -59,7 +68,16 @@ class StationState(Enum):
     ERROR = "Ошибка"
 
 
-@dataclass
+# Целочисленные коды состояний (порядок совпадает с StationState).
+# Station.state хранит код: сравнение int дешевле обращения к члену Enum.
+(IDLE, SENSING, SENDING_RTS, WAITING_CTS, SENDING_DATA,
+ WAITING_ACK, RECEIVING, BACKOFF, ERROR) = range(len(StationState))
+
+# Подписи состояний, индексируемые кодом
+_STATE_LABEL = tuple(state.value for state in StationState)
+
+
+@dataclass(slots=True)
 class Message:
     sender_id: int
     receiver_id: int
@@ -68,12 +86,19 @@ class Message:
 
 
 class Station:
+    __slots__ = ('id', 'x', 'y', 'state', 'message_queue', 'has_pending', 'current_message',
+                 'backoff_timer', 'timeout_timer', 'has_error', 'waiting_for_cts_from',
+                 'reserved_for', 'retry_counter', 'nav', 'difs_timer', 'transmission_history')
+
+    HISTORY_LIMIT = 100
+
     def __init__(self, station_id: int, x: float, y: float):
         self.id = station_id
         self.x = x
         self.y = y
-        self.state = StationState.IDLE
-        self.message_queue = []
+        self.state = IDLE  # Код состояния, см. _STATE_LABEL
+        self.message_queue: Deque[Message] = deque()
+        self.has_pending = False  # Очередь сообщений не пуста
         self.current_message: Optional[Message] = None
         self.backoff_timer = 0
         self.timeout_timer = 0
@@ -83,25 +108,33 @@ class Station:
         self.retry_counter = 0
         self.nav = 0  # Network Allocation Vector
         self.difs_timer = 0
-        self.transmission_history = []  # История передач для статистики
+        # История передач для статистики: (тип пакета, успех, шаг), последние записи
+        self.transmission_history: Deque[Tuple[str, bool, int]] = deque(maxlen=self.HISTORY_LIMIT)
 
     def add_message(self, receiver_id: int, data: str, message_id: int):
         msg = Message(self.id, receiver_id, data, message_id)
         self.message_queue.append(msg)
+        self.has_pending = True
 
     def set_error(self, error: bool):
         self.has_error = error
 
-    def add_transmission_record(self, packet_type: PacketType, success: bool):
-        self.transmission_history.append({
-            'type': packet_type,
-            'success': success,
-            'time': time.time()
-        })
+    def add_transmission_record(self, packet_type: PacketType, success: bool, step: int):
+        self.transmission_history.append((packet_type.value, bool(success), step))
 
 
 # ==================== Protocol Module ====================
 
+class BackoffPolicy(Enum):
+    BEB = "Двоичный экспоненциальный (BEB)"
+    CAB = "По числу недавних коллизий (CAB)"
+
+
+def _contention_windows(cw_min: int, cw_max: int, max_exponent: int) -> Tuple[int, ...]:
+    """Окна конкуренции min(cw_min * 2^k, cw_max) для k = 0..max_exponent"""
+    return tuple(min(cw_min << e, cw_max) for e in range(max_exponent + 1))
+
+
 class CSMACAProtocol:
     DIFS = 50
     SIFS = 10
@@ -114,41 +147,66 @@ class CSMACAProtocol:
     CW_MIN = 4
     CW_MAX = 32
     MAX_RETRIES = 10
+    COLLISION_WINDOW = 500  # Шагов, за которые CAB учитывает коллизии сети
+    CW_MAX_EXPONENT = 5  # Сколько раз окно может удвоиться
+    # Окно конкуренции по номеру попытки
+    _CW_TABLE = _contention_windows(CW_MIN, CW_MAX, CW_MAX_EXPONENT)
 
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None, backoff_policy: BackoffPolicy = BackoffPolicy.BEB):
+        self._rng = random.Random(seed)  # Собственный ГСЧ; seed делает прогон воспроизводимым
         self.stations: List[Station] = []
+        self._by_id: Dict[int, Station] = {}
         self.channel_busy = False
         self.current_transmission: Optional[Packet] = None
         self.transmission_timer = 0
         self.step_counter = 0
         self.last_collision_stations: List[Station] = []
         self.total_collisions = 0
+        self._recent_collisions: Deque[int] = deque()  # Шаги коллизий за последние COLLISION_WINDOW
         self.successful_transmissions = 0
         self.failed_transmissions = 0
         self.channel_utilization = 0
         self.active_time = 0
+        self._nav_horizon = 0  # Шагов до истечения самого длинного NAV в сети
+        self.backoff_policy = backoff_policy
+        self.verbose = False  # Подробный лог: отдельная строка NAV для каждой станции
+
+    @property
+    def backoff_policy(self) -> BackoffPolicy:
+        return self._backoff_policy
+
+    @backoff_policy.setter
+    def backoff_policy(self, policy: BackoffPolicy):
+        # BackoffPolicy(...) отвергает неизвестные значения с ValueError
+        self._backoff_policy = BackoffPolicy(policy)
 
     def add_station(self, x: float, y: float) -> Station:
         station_id = len(self.stations) + 1
-        existing_ids = {s.id for s in self.stations}
-        while station_id in existing_ids:
+        while station_id in self._by_id:
             station_id += 1
         station = Station(station_id, x, y)
         self.stations.append(station)
+        self._by_id[station_id] = station
         return station
 
     def remove_station(self, station_id: int):
         self.stations = [s for s in self.stations if s.id != station_id]
+        self._by_id.pop(station_id, None)
 
     def get_station(self, station_id: int) -> Optional[Station]:
-        for s in self.stations:
-            if s.id == station_id:
-                return s
-        return None
+        return self._by_id.get(station_id)
 
     def is_channel_idle(self) -> bool:
         return not self.channel_busy
 
+    def is_quiescent(self) -> bool:
+        """Сеть простаивает: канал свободен, очереди пусты, таймеры не идут"""
+        return not self.channel_busy and all(
+            not s.has_pending and s.state == IDLE and s.nav == 0
+            and s.timeout_timer == 0 and s.backoff_timer == 0
+            for s in self.stations
+        )
+
     def process_step(self) -> List[str]:
         logs = []
         self.step_counter += 1
@@ -159,128 +217,139 @@ class CSMACAProtocol:
             self.active_time += 1
         self.channel_utilization = self.active_time / self.step_counter
 
-        for station in self.stations:
-            if station.nav > 0:
-                station.nav -= 1
-
         if self.transmission_timer > 0:
             self.transmission_timer -= 1
             if self.transmission_timer == 0:
-                logs.extend(self._complete_transmission())
+                self._complete_transmission(logs)
 
         contention_winners = []
+        # Состояние канала внутри цикла не меняется: обработчики ниже его не занимают
+        channel_idle = self.is_channel_idle()
+        # NAV уменьшается в конце тела цикла, т.е. заранее для следующего шага;
+        # отсчет нужен, только пока хотя бы у одной станции NAV не истек
+        nav_pending = self._nav_horizon > 0
+        if nav_pending:
+            self._nav_horizon -= 1
 
         for station in self.stations:
             if station.timeout_timer > 0:
                 station.timeout_timer -= 1
                 if station.timeout_timer == 0:
                     logs.append(f"[Станция {station.id}] Таймаут истек")
-                    logs.extend(self._handle_timeout(station))
+                    self._handle_timeout(station, logs)
 
-            if station.state == StationState.SENSING:
-                if self.is_channel_idle() and station.nav == 0:
+            if station.state == SENSING:
+                if channel_idle and station.nav == 0:
                     station.difs_timer -= 1
                     if station.difs_timer == 0:
-                        logs.extend(self._start_initial_backoff(station))
+                        self._start_initial_backoff(station, logs)
                 else:
-                    station.state = StationState.IDLE
+                    station.state = IDLE
                     station.difs_timer = 0
                     logs.append(f"[Станция {station.id}] Канал занят во время DIFS, отмена")
 
-            elif station.state == StationState.BACKOFF:
+            elif station.state == BACKOFF:
                 if station.backoff_timer == 0:
                     contention_winners.append(station)
 
-                elif self.is_channel_idle() and station.nav == 0:
+                elif channel_idle and station.nav == 0:
                     station.backoff_timer -= 1
                     if station.backoff_timer == 0:
                         contention_winners.append(station)
 
-            elif station.state == StationState.IDLE and len(station.message_queue) > 0:
-                if self.is_channel_idle() and station.nav == 0:
-                    logs.extend(self._initiate_transmission(station))
+            elif station.state == IDLE and station.has_pending:
+                if channel_idle and station.nav == 0:
+                    self._initiate_transmission(station, logs)
+
+            if nav_pending and station.nav > 0:
+                station.nav -= 1
 
         if contention_winners:
-            logs.extend(self._handle_contention_resolution(contention_winners))
+            self._handle_contention_resolution(contention_winners, logs)
 
         return logs
 
-    def _handle_contention_resolution(self, winners: List[Station]) -> List[str]:
-        logs = []
+    def _handle_contention_resolution(self, winners: List[Station], logs: List[str]) -> None:
         if self.is_channel_idle():
             if len(winners) == 1:
                 winner = winners[0]
                 logs.append(f"[Станция {winner.id}] Выиграла конкуренцию")
-                logs.extend(self._send_rts(winner))
+                self._send_rts(winner, logs)
             else:
                 ids = ", ".join(str(s.id) for s in winners)
                 logs.append(f"[КОЛЛИЗИЯ] Станции {ids} пытаются передавать одновременно")
                 self.last_collision_stations = winners
                 self.total_collisions += 1
+                self._recent_collisions.append(self.step_counter)
                 for station in winners:
-                    station.add_transmission_record(PacketType.RTS, False)
-                    logs.extend(self._enter_backoff(station, is_collision=True))
+                    station.add_transmission_record(PacketType.RTS, False, self.step_counter)
+                    self._enter_backoff(station, is_collision=True, logs=logs)
         else:
             ids = ", ".join(str(s.id) for s in winners)
             logs.append(f"[Станция(и) {ids}] Backoff истек, но канал уже занят. Повтор.")
             for station in winners:
-                logs.extend(self._enter_backoff(station, is_collision=False))
-        return logs
+                self._enter_backoff(station, is_collision=False, logs=logs)
 
-    def _initiate_transmission(self, station: Station) -> List[str]:
+    def _initiate_transmission(self, station: Station, logs: List[str]) -> None:
         station.current_message = station.message_queue[0]
-        station.state = StationState.SENSING
+        station.state = SENSING
         station.difs_timer = self.DIFS
-        return [f"[Станция {station.id}] Прослушивание канала (DIFS)"]
+        logs.append(f"[Станция {station.id}] Прослушивание канала (DIFS)")
 
-    def _start_initial_backoff(self, station: Station) -> List[str]:
+    def _start_initial_backoff(self, station: Station, logs: List[str]) -> None:
         station.retry_counter = 0
-        backoff_slots = random.randint(0, self.CW_MIN - 1)
+        backoff_slots = self._rng.randint(0, self.CW_MIN - 1)
         station.backoff_timer = backoff_slots * self.SLOT_TIME
-        station.state = StationState.BACKOFF
+        station.state = BACKOFF
 
-        logs = [f"[Станция {station.id}] DIFS истек, начало Backoff: {station.backoff_timer} единиц"]
-        return logs
+        logs.append(f"[Станция {station.id}] DIFS истек, начало Backoff: {station.backoff_timer} единиц")
 
-    def _send_rts(self, station: Station) -> List[str]:
+    def _send_rts(self, station: Station, logs: List[str]) -> None:
         msg = station.current_message
         duration = self.CTS_TIME + self.SIFS + self.DATA_TIME + self.SIFS + self.ACK_TIME
         packet = Packet(PacketType.RTS, station.id, msg.receiver_id, duration=duration, message_id=msg.message_id)
 
-        station.state = StationState.SENDING_RTS
+        station.state = SENDING_RTS
         self.channel_busy = True
         self.current_transmission = packet
         self.transmission_timer = self.RTS_TIME
 
-        return [f"[Станция {station.id}] → RTS → Станция {msg.receiver_id} (duration={duration})"]
+        logs.append(f"[Станция {station.id}] → RTS → Станция {msg.receiver_id} (duration={duration})")
 
-    def _enter_backoff(self, station: Station, is_collision: bool) -> List[str]:
-        random.seed()
+    def _enter_backoff(self, station: Station, is_collision: bool, logs: List[str]) -> None:
         if is_collision:
             station.retry_counter += 1
 
-        cw_exponent = min(station.retry_counter, 5)
-        cw = min(self.CW_MIN * (2 ** cw_exponent), self.CW_MAX)
-        backoff_slots = random.randint(0, cw - 1)
+        if self._backoff_policy is BackoffPolicy.BEB:
+            cw = self._CW_TABLE[min(station.retry_counter, self.CW_MAX_EXPONENT)]
+        else:
+            # CAB: окно растет по корню из числа коллизий в скользящем окне шагов,
+            # старые коллизии забываются, и окно возвращается к CW_MIN
+            recent = self._recent_collisions
+            while recent and recent[0] <= self.step_counter - self.COLLISION_WINDOW:
+                recent.popleft()
+            retries = station.retry_counter
+            collision_load = retries * retries * len(recent)
+            cw = min(self.CW_MAX, self.CW_MIN * math.isqrt(1 + collision_load))
+        backoff_slots = self._rng.randint(0, cw - 1)
         backoff_time = backoff_slots * self.SLOT_TIME
 
         station.backoff_timer = backoff_time
-        station.state = StationState.BACKOFF
+        station.state = BACKOFF
         station.timeout_timer = 0
         station.waiting_for_cts_from = None
 
         log_msg = "Коллизия" if is_collision else "Повтор"
-        return [f"[Станция {station.id}] {log_msg}. Backoff: {backoff_time} (попытка {station.retry_counter + 1})"]
+        logs.append(f"[Станция {station.id}] {log_msg}. Backoff: {backoff_time} (попытка {station.retry_counter + 1})")
 
-    def _handle_timeout(self, station: Station) -> List[str]:
-        logs = []
+    def _handle_timeout(self, station: Station, logs: List[str]) -> None:
         intended_receiver_id = None
 
-        if station.state == StationState.WAITING_CTS:
+        if station.state == WAITING_CTS:
             logs.append(f"[Станция {station.id}] CTS не получен, повторная попытка")
             if station.current_message:
                 intended_receiver_id = station.current_message.receiver_id
-        elif station.state == StationState.WAITING_ACK:
+        elif station.state == WAITING_ACK:
             logs.append(f"[Станция {station.id}] ACK не получен, повторная попытка")
             if station.current_message:
                 intended_receiver_id = station.current_message.receiver_id
@@ -289,7 +358,7 @@ class CSMACAProtocol:
             if intended_receiver_id:
                 intended_receiver = self.get_station(intended_receiver_id)
                 if intended_receiver and intended_receiver.reserved_for == station.id:
-                    intended_receiver.state = StationState.IDLE
+                    intended_receiver.state = IDLE
                     intended_receiver.reserved_for = None
                     logs.append(
                         f"[Станция {intended_receiver_id}] Сброс состояния после отказа отправителя"
@@ -303,63 +372,80 @@ class CSMACAProtocol:
                     f"Сообщение #{failed_msg_id} помечено как недоставленное и удалено"
                 )
                 if len(station.message_queue) > 0 and station.message_queue[0].message_id == failed_msg_id:
-                    station.message_queue.pop(0)
+                    station.message_queue.popleft()
+                    station.has_pending = bool(station.message_queue)
 
             station.current_message = None
-            station.state = StationState.IDLE
+            station.state = IDLE
             station.timeout_timer = 0
             station.waiting_for_cts_from = None
             station.has_error = False
             station.retry_counter = 0
 
-            return logs
+            return
 
         if intended_receiver_id:
             intended_receiver = self.get_station(intended_receiver_id)
             if intended_receiver and intended_receiver.reserved_for == station.id:
-                intended_receiver.state = StationState.IDLE
+                intended_receiver.state = IDLE
                 intended_receiver.reserved_for = None
                 logs.append(f"[Станция {intended_receiver_id}] Сброс состояния после таймаута отправителя")
 
-        logs.extend(self._enter_backoff(station, is_collision=True))
-        return logs
+        self._enter_backoff(station, is_collision=True, logs=logs)
 
-    def _complete_transmission(self) -> List[str]:
-        logs = []
+    def _complete_transmission(self, logs: List[str]) -> None:
         if self.current_transmission is None:
             self.channel_busy = False
-            return logs
+            return
         packet = self.current_transmission
         original_packet = packet
         if packet.packet_type == PacketType.RTS:
-            logs.extend(self._handle_rts_received(packet))
+            self._handle_rts_received(packet, logs)
         elif packet.packet_type == PacketType.CTS:
-            logs.extend(self._handle_cts_received(packet))
+            self._handle_cts_received(packet, logs)
         elif packet.packet_type == PacketType.DATA:
-            logs.extend(self._handle_data_received(packet))
+            self._handle_data_received(packet, logs)
         elif packet.packet_type == PacketType.ACK:
-            logs.extend(self._handle_ack_received(packet))
+            self._handle_ack_received(packet, logs)
         if self.current_transmission is original_packet:
             self.current_transmission = None
             self.channel_busy = False
-        return logs
 
-    def _handle_rts_received(self, packet: Packet) -> List[str]:
-        logs = []
+    def _apply_nav(self, packet: Packet, extend_only: bool) -> List[Station]:
+        """Устанавливает NAV всем станциям, кроме участников обмена, за один проход"""
+        sender_id = packet.sender_id
+        receiver_id = packet.receiver_id
+        duration = packet.duration
+        affected = []
+        for station in self.stations:
+            sid = station.id
+            if sid == sender_id or sid == receiver_id:
+                continue
+            if extend_only and station.nav >= duration:
+                continue
+            station.nav = duration
+            affected.append(station)
+        if affected and duration > self._nav_horizon:
+            self._nav_horizon = duration
+        return affected
+
+    def _handle_rts_received(self, packet: Packet, logs: List[str]) -> None:
         sender = self.get_station(packet.sender_id)
         receiver = self.get_station(packet.receiver_id)
         if sender is None or receiver is None:
-            return logs
+            return
         logs.append(f"[Станция {packet.receiver_id}] ← RTS получен от станции {packet.sender_id}")
-        for station in self.stations:
-            if station.id != packet.sender_id and station.id != packet.receiver_id:
-                station.nav = packet.duration
-                logs.append(f"[Станция {station.id}] NAV установлен на {packet.duration}")
-        sender.state = StationState.WAITING_CTS
+        affected = self._apply_nav(packet, extend_only=False)
+        if affected:
+            logs.append(f"[NAV] {len(affected)} станций установили NAV={packet.duration}")
+            if self.verbose:
+                for station in affected:
+                    logs.append(f"[Станция {station.id}] NAV установлен на {packet.duration}")
+        sender.state = WAITING_CTS
         sender.timeout_timer = self.TIMEOUT
         sender.waiting_for_cts_from = packet.receiver_id
-        if receiver.state == StationState.IDLE or receiver.state == StationState.SENSING:
-            receiver.state = StationState.RECEIVING
+        if receiver.state == IDLE or receiver.state == SENSING:
+            receiver.state = RECEIVING
             receiver.reserved_for = packet.sender_id
             cts_packet = Packet(PacketType.CTS, packet.receiver_id, packet.sender_id,
                                 duration=packet.duration - self.CTS_TIME - self.SIFS, message_id=packet.message_id)
@@ -369,22 +455,20 @@ class CSMACAProtocol:
             logs.append(f"[Станция {packet.receiver_id}] → CTS → Станция {packet.sender_id} (после SIFS)")
         else:
             logs.append(f"[Станция {packet.receiver_id}] Занята, CTS не отправлен")
-        return logs
 
-    def _handle_cts_received(self, packet: Packet) -> List[str]:
-        logs = []
+    def _handle_cts_received(self, packet: Packet, logs: List[str]) -> None:
         sender = self.get_station(packet.sender_id)
         receiver = self.get_station(packet.receiver_id)
         if sender is None or receiver is None:
-            return logs
+            return
         logs.append(f"[Станция {packet.receiver_id}] ← CTS получен от станции {packet.sender_id}")
-        for station in self.stations:
-            if station.id != packet.sender_id and station.id != packet.receiver_id:
-                if station.nav < packet.duration:
-                    station.nav = packet.duration
-        if receiver.state == StationState.WAITING_CTS and receiver.waiting_for_cts_from == packet.sender_id:
+        affected = self._apply_nav(packet, extend_only=True)
+        if self.verbose:
+            for station in affected:
+                logs.append(f"[Станция {station.id}] NAV продлен до {packet.duration}")
+        if receiver.state == WAITING_CTS and receiver.waiting_for_cts_from == packet.sender_id:
             receiver.timeout_timer = 0
-            receiver.state = StationState.SENDING_DATA
+            receiver.state = SENDING_DATA
             msg = receiver.current_message
             data_packet = Packet(PacketType.DATA, receiver.id, packet.sender_id, data=msg.data,
                                  message_id=msg.message_id)
@@ -395,59 +479,55 @@ class CSMACAProtocol:
             self.transmission_timer = self.SIFS + self.DATA_TIME
             self.channel_busy = True
             logs.append(f"[Станция {receiver.id}] → DATA → Станция {packet.sender_id} (после SIFS)")
-        return logs
 
-    def _handle_data_received(self, packet: Packet) -> List[str]:
-        logs = []
+    def _handle_data_received(self, packet: Packet, logs: List[str]) -> None:
         sender = self.get_station(packet.sender_id)
         receiver = self.get_station(packet.receiver_id)
         if sender is None or receiver is None:
-            return logs
+            return
         logs.append(f"[Станция {packet.receiver_id}] ← DATA получены от станции {packet.sender_id}: '{packet.data}'")
-        sender.state = StationState.WAITING_ACK
+        sender.state = WAITING_ACK
         sender.timeout_timer = self.TIMEOUT
         if receiver.has_error:
             logs.append(f"[Станция {packet.receiver_id}] ОШИБКА ПРИЕМА: станция неисправна, ACK не отправлен")
-            receiver.state = StationState.IDLE
+            receiver.state = IDLE
             receiver.reserved_for = None
             self.failed_transmissions += 1
-            sender.add_transmission_record(PacketType.DATA, False)
-            return logs
+            sender.add_transmission_record(PacketType.DATA, False, self.step_counter)
+            return
         if "[ОШИБКА_ДАННЫХ]" in packet.data:
             logs.append(f"[Станция {packet.receiver_id}] Обнаружена ошибка в данных, ACK не отправлен")
-            receiver.state = StationState.IDLE
+            receiver.state = IDLE
             receiver.reserved_for = None
             self.failed_transmissions += 1
-            sender.add_transmission_record(PacketType.DATA, False)
-            return logs
+            sender.add_transmission_record(PacketType.DATA, False, self.step_counter)
+            return
         ack_packet = Packet(PacketType.ACK, packet.receiver_id, packet.sender_id, message_id=packet.message_id)
         self.current_transmission = ack_packet
         self.transmission_timer = self.SIFS + self.ACK_TIME
         self.channel_busy = True
         logs.append(f"[Станция {packet.receiver_id}] → ACK → Станция {packet.sender_id} (после SIFS)")
-        receiver.state = StationState.IDLE
+        receiver.state = IDLE
         receiver.reserved_for = None
-        return logs
 
-    def _handle_ack_received(self, packet: Packet) -> List[str]:
-        logs = []
+    def _handle_ack_received(self, packet: Packet, logs: List[str]) -> None:
         sender = self.get_station(packet.sender_id)
         receiver = self.get_station(packet.receiver_id)
         if sender is None or receiver is None:
-            return logs
+            return
         logs.append(f"[Станция {packet.receiver_id}] ← ACK получен от станции {packet.sender_id}")
-        if receiver.state == StationState.WAITING_ACK:
+        if receiver.state == WAITING_ACK:
             self.successful_transmissions += 1
-            receiver.add_transmission_record(PacketType.DATA, True)
+            receiver.add_transmission_record(PacketType.DATA, True, self.step_counter)
             receiver.timeout_timer = 0
             if len(receiver.message_queue) > 0 and receiver.message_queue[0].message_id == packet.message_id:
-                completed_msg = receiver.message_queue.pop(0)
+                completed_msg = receiver.message_queue.popleft()
+                receiver.has_pending = bool(receiver.message_queue)
                 logs.append(f"[Станция {receiver.id}] Сообщение #{completed_msg.message_id} успешно доставлено")
             receiver.current_message = None
-            receiver.state = StationState.IDLE
+            receiver.state = IDLE
             receiver.has_error = False
             receiver.retry_counter = 0
-        return logs
 
     def get_statistics(self) -> dict:
         """Возвращает статистику работы сети"""
@@ -466,16 +546,43 @@ class CSMACAProtocol:
 
 # Словарь для сопоставления состояний станций с цветами
 STATE_COLORS = {
-    StationState.IDLE: QColor("lightblue"),
-    StationState.SENSING: QColor("lightyellow"),
-    StationState.SENDING_RTS: QColor("orange"),
-    StationState.WAITING_CTS: QColor("yellow"),
-    StationState.SENDING_DATA: QColor("red"),
-    StationState.WAITING_ACK: QColor("pink"),
-    StationState.RECEIVING: QColor("lightgreen"),
-    StationState.BACKOFF: QColor("lightgray"),
-    StationState.ERROR: QColor("darkred"),
+    IDLE: QColor("lightblue"),
+    SENSING: QColor("lightyellow"),
+    SENDING_RTS: QColor("orange"),
+    WAITING_CTS: QColor("yellow"),
+    SENDING_DATA: QColor("red"),
+    WAITING_ACK: QColor("pink"),
+    RECEIVING: QColor("lightgreen"),
+    BACKOFF: QColor("lightgray"),
+    ERROR: QColor("darkred"),
 }
+# Те же цвета в списке, индексируемом кодом состояния
+STATE_COLORS_LIST = [STATE_COLORS[code] for code in range(len(StationState))]
+
+# Перья и кисти создаются один раз и переиспользуются при каждой перерисовке
+_NORMAL_PEN = QPen(Qt.GlobalColor.black, 2)
+_ERROR_PEN = QPen(QColor("purple"), 3, Qt.PenStyle.DashDotLine)
+_STATE_BRUSHES = [QBrush(color) for color in STATE_COLORS_LIST]
+_CHANNEL_BUSY_BRUSH = QBrush(QColor(255, 200, 200))
+_CHANNEL_FREE_BRUSH = QBrush(QColor(200, 255, 200))
+_TEXT_BUSY_BRUSH = QBrush(QColor("red"))
+_TEXT_FREE_BRUSH = QBrush(QColor("green"))
+
+# Шрифты подписей, общие для всех элементов сцены
+_FONT_BOLD = QFont()
+_FONT_BOLD.setBold(True)
+_FONT_ID = QFont()
+_FONT_ID.setBold(True)
+_FONT_ID.setPointSize(12)
+_FONT_SMALL = QFont()
+_FONT_SMALL.setPointSize(8)
+_FONT_BOLD_SMALL = QFont()
+_FONT_BOLD_SMALL.setBold(True)
+_FONT_BOLD_SMALL.setPointSize(8)
+_FONT_COLLISION = QFont()
+_FONT_COLLISION.setPointSize(20)
+_FONT_COLLISION.setBold(True)
+_COLLISION_BRUSH = QBrush(QColor("red"))
 
 # Словарь для сопоставления типов пакетов с цветами и стилями линий
 PACKET_LINE_STYLES = {
@@ -484,6 +591,19 @@ PACKET_LINE_STYLES = {
     PacketType.DATA: {"color": QColor("red"), "style": Qt.PenStyle.SolidLine, "width": 4},
     PacketType.ACK: {"color": QColor("green"), "style": Qt.PenStyle.DotLine, "width": 3},
 }
+# Те же стили в списке, индексируемом кодом типа пакета
+PACKET_LINE_STYLES_LIST = [PACKET_LINE_STYLES[packet_type] for packet_type in PacketType]
+
+
+def _make_pen(style: dict) -> QPen:
+    pen = QPen(style["color"], style["width"])
+    pen.setStyle(style["style"])
+    return pen
+
+
+# Готовые перья и кисти пакетов, индексируемые кодом типа пакета
+PACKET_PENS = [_make_pen(style) for style in PACKET_LINE_STYLES_LIST]
+PACKET_BRUSHES = [QBrush(style["color"]) for style in PACKET_LINE_STYLES_LIST]
 
 
 class ChannelStatusWidget(QGraphicsEllipseItem):
@@ -494,28 +614,33 @@ class ChannelStatusWidget(QGraphicsEllipseItem):
         self.setPos(x, y)
         self.protocol = protocol
         self.setBrush(QBrush(QColor(240, 240, 240)))
-        self.setPen(QPen(Qt.GlobalColor.black, 2))
+        self.setPen(_NORMAL_PEN)
+        # Растровый кэш: перерисовка только при смене состояния канала
+        self.setCacheMode(QGraphicsEllipseItem.CacheMode.DeviceCoordinateCache)
 
-        self.status_text = QGraphicsTextItem("Канал", self)
-        self.status_text.setDefaultTextColor(QColor("black"))
-        font = QFont()
-        font.setBold(True)
-        self.status_text.setFont(font)
-        self.status_text.setPos(15, 15)
+        self.status_text = QGraphicsSimpleTextItem("Канал", self)
+        self.status_text.setBrush(QBrush(QColor("black")))
+        self.status_text.setFont(_FONT_BOLD)
+        self.status_text.setPos(19, 19)
 
-        self.state_text = QGraphicsTextItem("Свободен", self)
-        self.state_text.setDefaultTextColor(QColor("green"))
-        self.state_text.setPos(10, 45)
+        self.state_text = QGraphicsSimpleTextItem("Свободен", self)
+        self.state_text.setBrush(_TEXT_FREE_BRUSH)
+        self.state_text.setPos(14, 49)
+        self._prev_busy = None  # Последнее отрисованное состояние канала
 
     def update_status(self):
-        if self.protocol.channel_busy:
-            self.setBrush(QBrush(QColor(255, 200, 200)))
-            self.state_text.setPlainText("Занят")
-            self.state_text.setDefaultTextColor(QColor("red"))
+        busy = self.protocol.channel_busy
+        if busy == self._prev_busy:
+            return
+        self._prev_busy = busy
+        if busy:
+            self.setBrush(_CHANNEL_BUSY_BRUSH)
+            self.state_text.setText("Занят")
+            self.state_text.setBrush(_TEXT_BUSY_BRUSH)
         else:
-            self.setBrush(QBrush(QColor(200, 255, 200)))
-            self.state_text.setPlainText("Свободен")
-            self.state_text.setDefaultTextColor(QColor("green"))
+            self.setBrush(_CHANNEL_FREE_BRUSH)
+            self.state_text.setText("Свободен")
+            self.state_text.setBrush(_TEXT_FREE_BRUSH)
 
 
 class MessageQueueDialog(QDialog):
@@ -532,7 +657,7 @@ class MessageQueueDialog(QDialog):
         # Основная информация о станции
         info_group = QGroupBox("Состояние станции")
         info_layout = QFormLayout()
-        info_layout.addRow("Состояние:", QLabel(f"<b>{self.station.state.value}</b>"))
+        info_layout.addRow("Состояние:", QLabel(f"<b>{_STATE_LABEL[self.station.state]}</b>"))
         info_layout.addRow("ID:", QLabel(str(self.station.id)))
         info_layout.addRow("NAV:", QLabel(str(self.station.nav)))
         info_layout.addRow("Backoff таймер:", QLabel(str(self.station.backoff_timer)))
@@ -551,9 +676,10 @@ class MessageQueueDialog(QDialog):
         if station.transmission_history:
             self.layout.addWidget(QLabel("<hr><b>История передач:</b>"))
             history_list = QListWidget()
-            for record in station.transmission_history[-10:]:  # Последние 10 записей
-                status = "✓" if record['success'] else "✗"
-                history_list.addItem(f"{status} {record['type'].value}")
+            for record in list(station.transmission_history)[-10:]:  # Последние 10 записей
+                packet_type, success, step = record
+                status = "✓" if success else "✗"
+                history_list.addItem(f"{status} {packet_type} (шаг {step})")
             self.layout.addWidget(history_list)
 
         self.close_button = QPushButton("Закрыть")
@@ -577,28 +703,25 @@ class StationGraphicsItem(QGraphicsEllipseItem):
         self.station = station
         self.main_window = main_window
         self.setPos(station.x, station.y)
-        self.setBrush(QBrush(STATE_COLORS[station.state]))
-        self.setPen(QPen(Qt.GlobalColor.black, 2))
+        self.setBrush(_STATE_BRUSHES[station.state])
+        self.setPen(_NORMAL_PEN)
 
         self.setFlag(QGraphicsEllipseItem.GraphicsItemFlag.ItemIsMovable)
         self.setFlag(QGraphicsEllipseItem.GraphicsItemFlag.ItemSendsGeometryChanges)
+        # Растровый кэш: станция перерисовывается только после update_state
+        self.setCacheMode(QGraphicsEllipseItem.CacheMode.DeviceCoordinateCache)
 
         # ID станции
-        self.id_text = QGraphicsTextItem(str(station.id), self)
-        self.id_text.setDefaultTextColor(QColor("black"))
-        font = QFont()
-        font.setBold(True)
-        font.setPointSize(12)
-        self.id_text.setFont(font)
-        self.id_text.setPos(22, 18)
+        self.id_text = QGraphicsSimpleTextItem(str(station.id), self)
+        self.id_text.setBrush(QBrush(QColor("black")))
+        self.id_text.setFont(_FONT_ID)
+        self.id_text.setPos(26, 22)
 
         # Состояние станции
-        self.state_text = QGraphicsTextItem("", self)
-        self.state_text.setDefaultTextColor(QColor("darkblue"))
-        font = QFont()
-        font.setPointSize(8)
-        self.state_text.setFont(font)
-        self.state_text.setPos(5, 62)
+        self.state_text = QGraphicsSimpleTextItem("", self)
+        self.state_text.setBrush(QBrush(QColor("darkblue")))
+        self.state_text.setFont(_FONT_SMALL)
+        self.state_text.setPos(9, 66)
 
         # Индикатор ошибки
         self.error_indicator = QGraphicsEllipseItem(50, 5, 10, 10, self)
@@ -606,36 +729,43 @@ class StationGraphicsItem(QGraphicsEllipseItem):
         self.error_indicator.setPen(QPen(Qt.GlobalColor.transparent))
         self.error_indicator.setVisible(station.has_error)
 
+        # Данные станции, по которым элемент был отрисован в последний раз
+        self._render_key = None
+
     def update_state(self):
+        station = self.station
+        render_key = (station.state, station.has_error, station.backoff_timer, station.nav)
+        if render_key == self._render_key:
+            return
+        self._render_key = render_key
+
         # Обновление цвета
-        self.setBrush(QBrush(STATE_COLORS[self.station.state]))
+        self.setBrush(_STATE_BRUSHES[station.state])
 
         # Обновление рамки для ошибок
-        pen = QPen(Qt.GlobalColor.black, 2)
-        if self.station.has_error:
-            pen = QPen(QColor("purple"), 3, Qt.PenStyle.DashDotLine)
-        self.setPen(pen)
+        self.setPen(_ERROR_PEN if station.has_error else _NORMAL_PEN)
 
         # Показываем/скрываем индикатор ошибки
-        self.error_indicator.setVisible(self.station.has_error)
+        self.error_indicator.setVisible(station.has_error)
 
         # Обновление текста состояния
         state_info = ""
-        if self.station.state == StationState.BACKOFF:
-            state_info = f"Backoff: {self.station.backoff_timer}"
-        elif self.station.nav > 0:
-            state_info = f"NAV: {self.station.nav}"
-        elif self.station.state == StationState.WAITING_CTS:
+        if station.state == BACKOFF:
+            state_info = f"Backoff: {station.backoff_timer}"
+        elif station.nav > 0:
+            state_info = f"NAV: {station.nav}"
+        elif station.state == WAITING_CTS:
             state_info = f"Ожидание CTS..."
-        elif self.station.state == StationState.WAITING_ACK:
+        elif station.state == WAITING_ACK:
             state_info = f"Ожидание ACK..."
 
-        self.state_text.setPlainText(state_info)
+        self.state_text.setText(state_info)
 
     def itemChange(self, change, value):
         if change == QGraphicsEllipseItem.GraphicsItemChange.ItemPositionChange and self.scene():
             self.station.x = value.x()
             self.station.y = value.y()
+            self.main_window.update_station_center(self, value)
             self.main_window.update_communication_link()
         return super().itemChange(change, value)
 
@@ -644,7 +774,7 @@ class StationGraphicsItem(QGraphicsEllipseItem):
         new_pos = self.pos()
         self.station.x = new_pos.x()
         self.station.y = new_pos.y()
-        self.main_window.log_output.append(
+        self.main_window.log_output.appendPlainText(
             f"[Станция {self.station.id}] перемещена в ({int(self.station.x)}, {int(self.station.y)})"
         )
 
@@ -657,7 +787,7 @@ class StationGraphicsItem(QGraphicsEllipseItem):
             super().mousePressEvent(event)
 
     def show_details_dialog(self):
-        was_running = self.main_window.timer.isActive()
+        was_running = self.main_window.simulation_running
         if was_running:
             self.main_window.stop_simulation()
 
@@ -669,30 +799,38 @@ class PacketAnimation(QGraphicsLineItem):
     """Анимация пакета (движущаяся точка по линии)"""
 
     def __init__(self, start_point, end_point, packet_type):
-        super().__init__(start_point.x(), start_point.y(), end_point.x(), end_point.y())
-        self.packet_type = packet_type
+        super().__init__()
+        self.packet_type = None
         self.animation_progress = 0
         self.animation_speed = 0.05
 
-        style = PACKET_LINE_STYLES.get(packet_type)
-        if style:
-            pen = QPen(style["color"], style["width"])
-            pen.setStyle(style["style"])
-            self.setPen(pen)
-
         # Точка пакета
         self.packet_dot = QGraphicsEllipseItem(-5, -5, 10, 10, self)
-        self.packet_dot.setBrush(QBrush(style["color"] if style else QColor("black")))
 
         # Текст типа пакета
-        self.packet_text = QGraphicsTextItem(packet_type.value, self)
-        self.packet_text.setDefaultTextColor(QColor("white"))
-        font = QFont()
-        font.setBold(True)
-        font.setPointSize(8)
-        self.packet_text.setFont(font)
+        self.packet_text = QGraphicsSimpleTextItem("", self)
+        self.packet_text.setBrush(QBrush(QColor("white")))
+        self.packet_text.setFont(_FONT_BOLD_SMALL)
+
+        self.set_endpoints(start_point, end_point, packet_type)
+
+    def set_endpoints(self, start_point, end_point, packet_type):
+        """Перенастраивает уже созданный элемент на новую передачу"""
+        self.setLine(start_point.x(), start_point.y(), end_point.x(), end_point.y())
+        self.animation_progress = 0
+        if packet_type is self.packet_type:
+            return
+        self.packet_type = packet_type
+
+        self.setPen(PACKET_PENS[packet_type.code])
+        self.packet_dot.setBrush(PACKET_BRUSHES[packet_type.code])
+        self.packet_text.setText(packet_type.value)
 
     def update_animation(self):
+        # Скрытый пакет не двигаем: setPos лишь инвалидирует его границы
+        if not self.isVisible():
+            return
+
         self.animation_progress += self.animation_speed
         if self.animation_progress > 1:
             self.animation_progress = 0
@@ -706,12 +844,15 @@ class PacketAnimation(QGraphicsLineItem):
         y = line.y1() + dy * self.animation_progress
 
         self.packet_dot.setPos(x, y)
-        self.packet_text.setPos(x - 10, y - 20)
+        self.packet_text.setPos(x - 6, y - 16)
 
 
 class MainWindow(QMainWindow):
     """Главное окно приложения."""
 
+    STATS_REFRESH_MS = 200
+    RENDER_INTERVAL_MS = 16
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Симулятор протокола CSMA/CA с RTS/CTS")
@@ -719,15 +860,39 @@ class MainWindow(QMainWindow):
 
         self.protocol = CSMACAProtocol()
         self.station_items: Dict[int, StationGraphicsItem] = {}
+        # Центры станций на сцене; пересчитываются только при перемещении
+        self._station_centers: Dict[int, QPointF] = {}
+        self._combo_ids: Set[int] = set()  # ID станций, уже внесенные в списки выбора
         self.message_counter = 1
+        self.simulation_running = False
         self.collision_indicator: Optional[QGraphicsSimpleTextItem] = None
-        self.packet_animations: List[PacketAnimation] = []
+        self._packet_anim: Optional[PacketAnimation] = None
+        self._link_key = None  # Отрисованная линия связи: (отправитель, получатель, тип, центры)
         self.channel_status_widget = None
+        # Панель статистики перестраивается только при изменении и не чаще STATS_REFRESH_MS
+        self._last_stats_tuple = None
+        self._stats_elapsed = QElapsedTimer()
+        self._rendered_quiescent = False  # Последний отрисованный шаг был простоем
 
         self.timer = QTimer(self)
         self.timer.setInterval(200)  # Увеличен интервал для лучшей визуализации
         self.timer.timeout.connect(self.update_simulation)
 
+        # Мигание индикатора коллизии: таймер работает, только пока коллизия на экране
+        self._blink_state = False
+        self._blink_timer = QTimer(self)
+        self._blink_timer.setInterval(250)
+        self._blink_timer.timeout.connect(self._toggle_blink)
+
+        # Вывод отделен от шагов симуляции: лог копится и сбрасывается
+        # вместе с перерисовкой не чаще раза в RENDER_INTERVAL_MS
+        self._pending_logs: List[str] = []
+        self._needs_visual_update = False
+        self._render_timer = QTimer(self)
+        self._render_timer.setSingleShot(True)
+        self._render_timer.setInterval(self.RENDER_INTERVAL_MS)
+        self._render_timer.timeout.connect(self.render_frame)
+
         self.setup_ui()
         self.init_simulation()
 
@@ -756,9 +921,17 @@ class MainWindow(QMainWindow):
 
         # Графическая сцена
         self.scene = QGraphicsScene()
+        # Элементов немного, а двигаются они постоянно: BSP-индекс только мешает
+        self.scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
         self.scene.setSceneRect(0, 0, 900, 700)
         self.view = QGraphicsView(self.scene)
         self.view.setRenderHint(QPainter.RenderHint.Antialiasing)
+        # Каждый шаг меняет много мелких элементов — дешевле перерисовать весь вид
+        self.view.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.FullViewportUpdate)
+        self.view.setOptimizationFlags(
+            QGraphicsView.OptimizationFlag.DontSavePainterState
+            | QGraphicsView.OptimizationFlag.DontAdjustForAntialiasing
+        )
         left_panel.addWidget(self.view)
 
         # Индикатор связи
@@ -792,6 +965,16 @@ class MainWindow(QMainWindow):
         speed_layout.addWidget(self.speed_slider)
         controls_inner.addLayout(speed_layout)
 
+        # Политика окна конкуренции
+        backoff_layout = QHBoxLayout()
+        backoff_layout.addWidget(QLabel("Backoff:"))
+        self.backoff_combo = QComboBox()
+        for policy in BackoffPolicy:
+            self.backoff_combo.addItem(policy.value, policy)
+        self.backoff_combo.currentIndexChanged.connect(self.update_backoff_policy)
+        backoff_layout.addWidget(self.backoff_combo)
+        controls_inner.addLayout(backoff_layout)
+
         # Кнопки управления
         self.start_button = QPushButton("▶ Старт")
         self.start_button.clicked.connect(self.start_simulation)
@@ -815,13 +998,23 @@ class MainWindow(QMainWindow):
 
         # Статистика
         stats_group = QGroupBox("Статистика сети")
-        stats_layout = QVBoxLayout()
-        self.stats_text = QTextEdit()
-        self.stats_text.setReadOnly(True)
-        self.stats_text.setMaximumHeight(150)
-        stats_layout.addWidget(self.stats_text)
-        controls_group.setLayout(stats_layout)
-        controls_layout.addWidget(controls_group)
+        stats_layout = QFormLayout()
+        self.stat_stations_lbl = QLabel("0")
+        self.stat_steps_lbl = QLabel("0")
+        self.stat_success_lbl = QLabel("0")
+        self.stat_failed_lbl = QLabel("0")
+        self.stat_collisions_lbl = QLabel("0")
+        self.stat_utilization_lbl = QLabel("0")
+        self.stat_messages_lbl = QLabel("0")
+        stats_layout.addRow("Станций:", self.stat_stations_lbl)
+        stats_layout.addRow("Шаг симуляции:", self.stat_steps_lbl)
+        stats_layout.addRow("Успешные передачи:", self.stat_success_lbl)
+        stats_layout.addRow("Неудачные передачи:", self.stat_failed_lbl)
+        stats_layout.addRow("Коллизии:", self.stat_collisions_lbl)
+        stats_layout.addRow("Использование канала:", self.stat_utilization_lbl)
+        stats_layout.addRow("Сообщений в очередях:", self.stat_messages_lbl)
+        stats_group.setLayout(stats_layout)
+        controls_layout.addWidget(stats_group)
 
         controls_layout.addStretch()
         controls_tab.setLayout(controls_layout)
@@ -835,6 +1028,13 @@ class MainWindow(QMainWindow):
         station_layout = QFormLayout()
         self.station_x = QLineEdit("100")
         self.station_y = QLineEdit("100")
+        # Ввод проверяется при наборе; локаль C без разделителя групп ("1,000" не пропускается)
+        coord_locale = QLocale.c()
+        coord_locale.setNumberOptions(QLocale.NumberOption.RejectGroupSeparator)
+        coord_validator = QDoubleValidator(-10000, 10000, 2, self)
+        coord_validator.setLocale(coord_locale)
+        self.station_x.setValidator(coord_validator)
+        self.station_y.setValidator(coord_validator)
         self.add_station_button = QPushButton("➕ Добавить")
         self.add_station_button.clicked.connect(self.add_station)
         station_layout.addRow("X:", self.station_x)
@@ -910,8 +1110,9 @@ class MainWindow(QMainWindow):
         # Лог
         log_group = QGroupBox("Лог транзакций")
         log_layout = QVBoxLayout()
-        self.log_output = QTextEdit()
+        self.log_output = QPlainTextEdit()
         self.log_output.setReadOnly(True)
+        self.log_output.setMaximumBlockCount(1000)  # Старые строки отбрасываются
         self.log_output.setMaximumHeight(250)
         log_layout.addWidget(self.log_output)
         log_group.setLayout(log_layout)
@@ -948,7 +1149,7 @@ class MainWindow(QMainWindow):
         main_layout.addLayout(right_panel, 1)
 
     def init_simulation(self):
-        self.protocol = CSMACAProtocol()
+        self.protocol = CSMACAProtocol(backoff_policy=self.backoff_combo.currentData())
         self.scene.clear()
 
         # Добавляем индикатор канала
@@ -959,12 +1160,26 @@ class MainWindow(QMainWindow):
         self.communication_link_item.setZValue(-1)
         self.scene.addItem(self.communication_link_item)
         self.communication_link_item.hide()
+        self._link_key = None
+
+        # Индикатор коллизии создается один раз и только показывается/скрывается
+        self._blink_timer.stop()
+        self.collision_indicator = QGraphicsSimpleTextItem("💥 КОЛЛИЗИЯ!")
+        self.collision_indicator.setFont(_FONT_COLLISION)
+        self.collision_indicator.setBrush(_COLLISION_BRUSH)
+        self.collision_indicator.setZValue(10)
+        self.collision_indicator.setVisible(False)
+        self.scene.addItem(self.collision_indicator)
 
-        self.collision_indicator = None
         self.station_items.clear()
-        self.packet_animations.clear()
+        self._station_centers.clear()
+        self._packet_anim = None  # Удален вместе со сценой
+        self._render_timer.stop()
+        self._pending_logs.clear()
+        self._needs_visual_update = False
         self.log_output.clear()
         self.message_counter = 1
+        self._rendered_quiescent = False
 
         # Добавляем начальные станции
         self.add_station(is_initial=True, x=200, y=300)
@@ -973,122 +1188,165 @@ class MainWindow(QMainWindow):
 
         self.update_station_id_selectors()
         self.update_communication_link()
-        self.update_statistics()
+        self.update_statistics(force=True)
 
     def update_simulation_speed(self):
         speed = self.speed_slider.value()
         interval = 300 - (speed * 25)  # От 275 до 50 мс
         self.timer.setInterval(interval)
 
+    def update_backoff_policy(self):
+        policy = self.backoff_combo.currentData()
+        self.protocol.backoff_policy = policy
+        self.log_output.appendPlainText(f"⚙ Политика backoff: {policy.value}")
+
     def add_station(self, is_initial=False, x=None, y=None):
-        try:
-            pos_x = float(self.station_x.text()) if x is None else x
-            pos_y = float(self.station_y.text()) if y is None else y
+        pos_x = self._read_coordinate(self.station_x) if x is None else x
+        pos_y = self._read_coordinate(self.station_y) if y is None else y
+        if pos_x is None or pos_y is None:
+            self.log_output.appendPlainText("❌ Ошибка: Неверные координаты для станции.")
+            return
 
-            station = self.protocol.add_station(pos_x, pos_y)
-            item = StationGraphicsItem(station, self)
-            self.station_items[station.id] = item
-            self.scene.addItem(item)
+        station = self.protocol.add_station(pos_x, pos_y)
+        item = StationGraphicsItem(station, self)
+        self.station_items[station.id] = item
+        self.scene.addItem(item)
+        self.update_station_center(item, item.pos())
 
-            if not is_initial:
-                self.log_output.append(f"✅ Добавлена станция {station.id} в ({pos_x}, {pos_y})")
-            self.update_station_id_selectors()
-        except ValueError:
-            self.log_output.append("❌ Ошибка: Неверные координаты для станции.")
+        if not is_initial:
+            self.log_output.appendPlainText(f"✅ Добавлена станция {station.id} в ({pos_x}, {pos_y})")
+        self.update_station_id_selectors()
+
+    def _read_coordinate(self, line_edit: QLineEdit) -> Optional[float]:
+        """Координата из поля ввода или None, если текст не принят валидатором"""
+        if not line_edit.hasAcceptableInput():
+            return None
+        # Разбор той же локалью, что и у валидатора, а не через float()
+        value, ok = line_edit.validator().locale().toDouble(line_edit.text())
+        return value if ok else None
 
     def delete_station(self):
         if not self.delete_station_id_combo.currentText():
-            self.log_output.append("❌ Нет станций для удаления.")
+            self.log_output.appendPlainText("❌ Нет станций для удаления.")
             return
         station_id = int(self.delete_station_id_combo.currentText())
         if station_id in self.station_items:
             item_to_remove = self.station_items[station_id]
             self.scene.removeItem(item_to_remove)
             del self.station_items[station_id]
+            del self._station_centers[station_id]
             self.protocol.remove_station(station_id)
-            self.log_output.append(f"🗑 Станция {station_id} удалена.")
+            self.log_output.appendPlainText(f"🗑 Станция {station_id} удалена.")
             self.update_station_id_selectors()
             self.update_communication_link()
         else:
-            self.log_output.append(f"❌ Ошибка: Станция {station_id} не найдена.")
+            self.log_output.appendPlainText(f"❌ Ошибка: Станция {station_id} не найдена.")
+
+    def update_station_center(self, item: StationGraphicsItem, pos: QPointF):
+        """Запоминает центр станции для позиции элемента pos"""
+        center_offset = item.rect().width() / 2
+        self._station_centers[item.station.id] = QPointF(pos.x() + center_offset, pos.y() + center_offset)
 
     def update_station_id_selectors(self):
-        ids = sorted([str(s.id) for s in self.protocol.stations], key=int)
+        # Списки меняются только на разницу; выбранные элементы сохраняются сами
+        new_ids = {s.id for s in self.protocol.stations}
+        added = sorted(new_ids - self._combo_ids)
+        removed = self._combo_ids - new_ids
+        if not added and not removed:
+            return
 
-        current_sender = self.sender_id_combo.currentText()
-        current_receiver = self.receiver_id_combo.currentText()
-        current_delete = self.delete_station_id_combo.currentText()
-        current_error = self.error_station_id_combo.currentText()
+        # Позиции вставки в отсортированном по возрастанию списке
+        remaining = sorted(self._combo_ids - removed)
+        insertions = []
+        for station_id in added:
+            position = bisect.bisect_left(remaining, station_id)
+            remaining.insert(position, station_id)
+            insertions.append((position, str(station_id)))
 
         combos = [self.sender_id_combo, self.receiver_id_combo,
                   self.delete_station_id_combo, self.error_station_id_combo]
         for combo in combos:
-            combo.clear()
-            combo.addItems(ids)
+            combo.blockSignals(True)
+            for station_id in removed:
+                index = combo.findText(str(station_id))
+                if index >= 0:
+                    combo.removeItem(index)
+            for position, text in insertions:
+                combo.insertItem(position, text)
+            combo.blockSignals(False)
 
-        if current_sender in ids: self.sender_id_combo.setCurrentText(current_sender)
-        if current_receiver in ids: self.receiver_id_combo.setCurrentText(current_receiver)
-        if current_delete in ids: self.delete_station_id_combo.setCurrentText(current_delete)
-        if current_error in ids: self.error_station_id_combo.setCurrentText(current_error)
+        self._combo_ids = new_ids
 
     def inject_error(self):
         station_id_str = self.error_station_id_combo.currentText()
         if not station_id_str:
-            self.log_output.append("❌ Ошибка: Станция для внесения ошибки не выбрана.")
+            self.log_output.appendPlainText("❌ Ошибка: Станция для внесения ошибки не выбрана.")
             return
         station = self.protocol.get_station(int(station_id_str))
         if station:
             station.set_error(True)
-            self.log_output.append(f"⚠ Внесена ошибка в станцию {station.id}.")
+            self.log_output.appendPlainText(f"⚠ Внесена ошибка в станцию {station.id}.")
             self.station_items[station.id].update_state()
         else:
-            self.log_output.append(f"❌ Ошибка: Не удалось найти станцию {station_id_str}.")
+            self.log_output.appendPlainText(f"❌ Ошибка: Не удалось найти станцию {station_id_str}.")
 
     def fix_error(self):
         station_id_str = self.error_station_id_combo.currentText()
         if not station_id_str:
-            self.log_output.append("❌ Ошибка: Станция для устранения ошибки не выбрана.")
+            self.log_output.appendPlainText("❌ Ошибка: Станция для устранения ошибки не выбрана.")
             return
         station = self.protocol.get_station(int(station_id_str))
         if station:
             station.set_error(False)
-            self.log_output.append(f"✅ Ошибка на станции {station.id} устранена.")
+            self.log_output.appendPlainText(f"✅ Ошибка на станции {station.id} устранена.")
             self.station_items[station.id].update_state()
         else:
-            self.log_output.append(f"❌ Ошибка: Не удалось найти станцию {station_id_str}.")
+            self.log_output.appendPlainText(f"❌ Ошибка: Не удалось найти станцию {station_id_str}.")
 
     def send_message(self):
         sender_id_str = self.sender_id_combo.currentText()
         receiver_id_str = self.receiver_id_combo.currentText()
         if not sender_id_str or not receiver_id_str:
-            self.log_output.append("❌ Ошибка: Необходимо выбрать отправителя и получателя.")
+            self.log_output.appendPlainText("❌ Ошибка: Необходимо выбрать отправителя и получателя.")
             return
         sender_id = int(sender_id_str)
         receiver_id = int(receiver_id_str)
         data = self.message_data_input.text()
         if sender_id == receiver_id:
-            self.log_output.append("❌ Ошибка: Отправитель и получатель не могут совпадать.")
+            self.log_output.appendPlainText("❌ Ошибка: Отправитель и получатель не могут совпадать.")
             return
         sender = self.protocol.get_station(sender_id)
         if sender and data:
             sender.add_message(receiver_id, data, self.message_counter)
-            self.log_output.append(
+            self.log_output.appendPlainText(
                 f"📨 [Сообщение #{self.message_counter}] Станция {sender_id} -> Станция {receiver_id}: '{data}' добавлено в очередь.")
             self.message_counter += 1
+            # Таймер мог остановиться при простое сети — будим его
+            if self.simulation_running and not self.timer.isActive():
+                self.timer.start()
         else:
-            self.log_output.append("❌ Ошибка: Не удалось добавить сообщение.")
+            self.log_output.appendPlainText("❌ Ошибка: Не удалось добавить сообщение.")
 
     def start_simulation(self):
+        self.simulation_running = True
         self.timer.start()
         self.start_button.setEnabled(False)
         self.stop_button.setEnabled(True)
         self.step_button.setEnabled(False)
 
     def stop_simulation(self):
+        self.simulation_running = False
         self.timer.stop()
         self.start_button.setEnabled(True)
         self.stop_button.setEnabled(False)
         self.step_button.setEnabled(True)
+        # Последнее обновление панели могло быть пропущено ограничением частоты
+        self.update_statistics(force=True)
+        # На паузе индикатор коллизии не мигает; следующий рендер запустит мигание снова
+        if self._blink_timer.isActive():
+            self._blink_timer.stop()
+            self._blink_state = True
+            self.collision_indicator.setVisible(True)
 
     def step_simulation(self):
         self.update_simulation()
@@ -1096,113 +1354,129 @@ class MainWindow(QMainWindow):
     def reset_simulation(self):
         self.stop_simulation()
         self.init_simulation()
-        self.log_output.append("🔄 Симуляция сброшена.")
+        self.log_output.appendPlainText("🔄 Симуляция сброшена.")
 
     def update_simulation(self):
+        """Шаг протокола; лог и визуализация выводятся отдельно в render_frame"""
         logs = self.protocol.process_step()
-        if logs:
-            self.log_output.append(f"--- Шаг {self.protocol.step_counter} ---")
-            for log_entry in logs:
-                self.log_output.append(log_entry)
+        quiescent = self.protocol.is_quiescent()
+        # Нечего моделировать — останавливаем таймер до нового сообщения
+        if quiescent and self.timer.isActive():
+            self.timer.stop()
 
-        self.update_station_visuals()
-        self.update_communication_link()
-        self.handle_collision_visuals()
-        self.update_statistics()
-        self.update_packet_animations()
-
-        if self.channel_status_widget:
-            self.channel_status_widget.update_status()
-
-        if self.autoscroll_checkbox.isChecked():
-            self.log_output.verticalScrollBar().setValue(self.log_output.verticalScrollBar().maximum())
+        if logs:
+            self._pending_logs.append(f"--- Шаг {self.protocol.step_counter} ---")
+            self._pending_logs.extend(logs)
+
+        # Простой уже отрисован: на сцене меняться нечему
+        if logs or not (quiescent and self._rendered_quiescent):
+            self._needs_visual_update = True
+        self._rendered_quiescent = quiescent
+
+        if not self._render_timer.isActive():
+            self._render_timer.start()
+
+    def render_frame(self):
+        """Выводит накопленный лог и обновляет сцену, если шаги ее изменили"""
+        if self._pending_logs:
+            # Лог перерисовывается один раз после добавления всех строк
+            self.log_output.setUpdatesEnabled(False)
+            try:
+                self.log_output.appendPlainText("\n".join(self._pending_logs))
+                self._pending_logs.clear()
+                if self.autoscroll_checkbox.isChecked():
+                    self.log_output.verticalScrollBar().setValue(self.log_output.verticalScrollBar().maximum())
+            finally:
+                self.log_output.setUpdatesEnabled(True)
+
+        if self._needs_visual_update:
+            self._needs_visual_update = False
+            # Сцена перерисовывается один раз, после всех изменений
+            self.view.setUpdatesEnabled(False)
+            try:
+                self.update_station_visuals()
+                self.update_communication_link()
+                self.handle_collision_visuals()
+                # Без работающего таймера следующего обновления может не быть
+                self.update_statistics(force=not self.timer.isActive())
+                self.update_packet_animations()
+
+                if self.channel_status_widget:
+                    self.channel_status_widget.update_status()
+            finally:
+                self.view.setUpdatesEnabled(True)
+                self.view.viewport().update()
+        else:
+            # На сцене ничего не изменилось, но шаг и загрузка канала в статистике сдвинулись
+            self.update_statistics(force=not self.timer.isActive())
 
     def update_packet_animations(self):
-        # Очищаем старые анимации
-        for anim in self.packet_animations:
-            self.scene.removeItem(anim)
-        self.packet_animations.clear()
-
-        # Создаем новую анимацию если есть передача
+        # Один элемент анимации переиспользуется: меняем концы линии и видимость
         transmission = self.protocol.current_transmission
-        if transmission and transmission.sender_id in self.station_items and transmission.receiver_id in self.station_items:
-            sender_item = self.station_items[transmission.sender_id]
-            receiver_item = self.station_items[transmission.receiver_id]
-
-            center_offset = sender_item.rect().width() / 2
-            start_point = sender_item.pos() + QPointF(center_offset, center_offset)
-            end_point = receiver_item.pos() + QPointF(center_offset, center_offset)
-
-            animation = PacketAnimation(start_point, end_point, transmission.packet_type)
-            self.packet_animations.append(animation)
-            self.scene.addItem(animation)
+        centers = self._station_centers
+        if transmission and transmission.sender_id in centers and transmission.receiver_id in centers:
+            start_point = centers[transmission.sender_id]
+            end_point = centers[transmission.receiver_id]
+
+            if self._packet_anim is None:
+                self._packet_anim = PacketAnimation(start_point, end_point, transmission.packet_type)
+                self.scene.addItem(self._packet_anim)
+            else:
+                self._packet_anim.set_endpoints(start_point, end_point, transmission.packet_type)
+            self._packet_anim.setVisible(True)
+        elif self._packet_anim is not None:
+            self._packet_anim.setVisible(False)
 
     def update_station_visuals(self):
-        for station_id, item in self.station_items.items():
-            station = self.protocol.get_station(station_id)
-            if station:
-                item.station = station
-                item.update_state()
+        # Элемент хранит ссылку на ту же станцию, что и протокол, — искать ее не нужно
+        for item in self.station_items.values():
+            item.update_state()
 
     def handle_collision_visuals(self):
         collided_stations = self.protocol.last_collision_stations
         if not collided_stations:
-            if self.collision_indicator:
-                self.scene.removeItem(self.collision_indicator)
-                self.collision_indicator = None
+            self._blink_timer.stop()
+            # Индикатор мог остаться видимым после остановки мигания на паузе
+            if self.collision_indicator.isVisible():
+                self.collision_indicator.setVisible(False)
             return
 
         avg_x, avg_y = 0, 0
         station_count = 0
         for station in collided_stations:
-            if station.id in self.station_items:
-                item = self.station_items[station.id]
-                pos = item.pos()
-                avg_x += pos.x()
-                avg_y += pos.y()
-                station_count += 1
-            else:
+            center = self._station_centers.get(station.id)
+            if center is None:
                 continue
+            avg_x += center.x()
+            avg_y += center.y()
+            station_count += 1
 
         if station_count == 0:
             return
 
-        center_offset = 30  # Половина размера станции
-        center_point = QPointF((avg_x / station_count) + center_offset, (avg_y / station_count) + center_offset)
-
-        if not self.collision_indicator:
-            self.collision_indicator = QGraphicsSimpleTextItem("💥 КОЛЛИЗИЯ!")
-            font = QFont()
-            font.setPointSize(20)
-            font.setBold(True)
-            self.collision_indicator.setFont(font)
-            self.collision_indicator.setBrush(QBrush(QColor("red")))
+        center_point = QPointF(avg_x / station_count, avg_y / station_count)
 
         self.collision_indicator.setPos(center_point)
-        self.collision_indicator.setZValue(10)
-        if self.collision_indicator not in self.scene.items():
-            self.scene.addItem(self.collision_indicator)
 
-        # Мигающий эффект
-        current_time = time.time()
-        if int(current_time * 2) % 2 == 0:
+        # Мигающий эффект: дальше видимость переключает _toggle_blink
+        if not self._blink_timer.isActive():
+            self._blink_state = True
             self.collision_indicator.setVisible(True)
-        else:
-            self.collision_indicator.setVisible(False)
+            self._blink_timer.start()
+
+    def _toggle_blink(self):
+        self._blink_state = not self._blink_state
+        self.collision_indicator.setVisible(self._blink_state)
 
-    def update_statistics(self):
+    def update_statistics(self, force=False):
         stats = self.protocol.get_statistics()
-        stats_text = f"""
-        <b>Статистика сети:</b><br>
-        Станций: {stats['total_stations']}<br>
-        Шаг симуляции: {stats['total_steps']}<br>
-        Успешные передачи: {stats['successful_transmissions']}<br>
-        Неудачные передачи: {stats['failed_transmissions']}<br>
-        Коллизии: {stats['total_collisions']}<br>
-        Использование канала: {stats['channel_utilization']}<br>
-        Сообщений в очередях: {stats['total_messages']}
-        """
-        self.stats_text.setHtml(stats_text)
+        stats_tuple = tuple(stats.values())
+        if stats_tuple != self._last_stats_tuple and (
+                force or not self._stats_elapsed.isValid()
+                or self._stats_elapsed.elapsed() >= self.STATS_REFRESH_MS):
+            self._last_stats_tuple = stats_tuple
+            self._stats_elapsed.restart()
+            self._update_stats_panel(stats)
 
         # Обновляем статусные метки
         self.step_label.setText(f"Шаг: {stats['total_steps']}")
@@ -1210,48 +1484,49 @@ class MainWindow(QMainWindow):
         self.success_label.setText(f"Успешные: {stats['successful_transmissions']}")
         self.channel_label.setText(f"Канал: {'Занят' if self.protocol.channel_busy else 'Свободен'}")
 
+    def _update_stats_panel(self, stats: dict):
+        self.stat_stations_lbl.setText(str(stats['total_stations']))
+        self.stat_steps_lbl.setText(str(stats['total_steps']))
+        self.stat_success_lbl.setText(str(stats['successful_transmissions']))
+        self.stat_failed_lbl.setText(str(stats['failed_transmissions']))
+        self.stat_collisions_lbl.setText(str(stats['total_collisions']))
+        self.stat_utilization_lbl.setText(str(stats['channel_utilization']))
+        self.stat_messages_lbl.setText(str(stats['total_messages']))
+
     def update_communication_link(self):
         transmission = self.protocol.current_transmission
         if not transmission:
-            self.communication_link_item.hide()
+            self._hide_communication_link()
             return
 
         sender_id = transmission.sender_id
         receiver_id = transmission.receiver_id
 
-        if sender_id in self.station_items and receiver_id in self.station_items:
-            sender_item = self.station_items[sender_id]
-            receiver_item = self.station_items[receiver_id]
-
-            center_offset = sender_item.rect().width() / 2
-            p1 = sender_item.pos()
-            p2 = receiver_item.pos()
-
-            self.communication_link_item.setLine(
-                p1.x() + center_offset, p1.y() + center_offset,
-                p2.x() + center_offset, p2.y() + center_offset
-            )
-
-            pen = QPen()
-            style_info = PACKET_LINE_STYLES.get(transmission.packet_type)
-            if style_info:
-                pen.setColor(style_info["color"])
-                pen.setStyle(style_info["style"])
-                pen.setWidth(style_info["width"])
-            else:
-                pen.setColor(QColor("black"))
-                pen.setWidth(2)
+        if sender_id in self._station_centers and receiver_id in self._station_centers:
+            p1 = self._station_centers[sender_id]
+            p2 = self._station_centers[receiver_id]
+
+            # Та же передача между теми же точками уже нарисована
+            link_key = (sender_id, receiver_id, transmission.packet_type, p1, p2)
+            if link_key == self._link_key:
+                return
+            self._link_key = link_key
 
-            self.communication_link_item.setPen(pen)
+            self.communication_link_item.setLine(p1.x(), p1.y(), p2.x(), p2.y())
+
+            self.communication_link_item.setPen(PACKET_PENS[transmission.packet_type.code])
             self.communication_link_item.show()
         else:
-            self.communication_link_item.hide()
+            self._hide_communication_link()
+
+    def _hide_communication_link(self):
+        self._link_key = None
+        self.communication_link_item.hide()
 
 
 # ==================== Main Entry Point ====================
 
 def main():
-    random.seed(time.time())
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()